@@ -55,6 +55,7 @@ class CodeGeneratorCPPWindowsX86_64:
     def __init__(self):
         self.architecture = "x86-64"
         self.version = "C++ Windows"
+        self.compile_native = True
 
     def generate_code(self, ir, outdir='out'):
         os.makedirs(outdir, exist_ok=True)
@@ -69,6 +70,8 @@ class CodeGeneratorCPPWindowsX86_64:
         print(f"C++ Windows x86-64 metadata -> {out_file}")
         modules = meta.get('modules', [])
         _generate_common_build_files(modules, outdir=outdir, target='windows')
+        if not self.compile_native:
+            return
         try:
             _compile_native_project(outdir, 'windows')
         except Exception as e:
@@ -78,6 +81,7 @@ class CodeGeneratorCPPLinuxX86_64:
     def __init__(self):
         self.architecture = "x86-64"
         self.version = "C++ Linux"
+        self.compile_native = True
 
     def generate_code(self, ir, outdir='out'):
         os.makedirs(outdir, exist_ok=True)
@@ -92,12 +96,55 @@ class CodeGeneratorCPPLinuxX86_64:
         print(f"C++ Linux x86-64 metadata -> {out_file}")
         modules = meta.get('modules', [])
         _generate_common_build_files(modules, outdir=outdir, target='linux')
+        if not self.compile_native:
+            return
         try:
             _compile_native_project(outdir, 'linux')
         except Exception as e:
             print(f"Native compilation failed: {e}")
 
 
+def _map_type(t):
+    if not t:
+        return 'void'
+    t = str(t)
+    if t.startswith('mut '):
+        base = t[len('mut '):]
+        return _map_type(base) + '*'
+    if t.startswith('signal ') or t.startswith('signal/'):
+        return f'Signal<{_map_type(t[len("signal "):].strip())}>'
+    if t.startswith('unsigned:'):
+        base = t[len('unsigned:'):]
+        if base == 'int':
+            return 'unsigned int'
+        return f'unsigned {base}'
+    if t in ('int', 'i32'):
+        return 'int32_t'
+    if t in ('i16', 'i8'):
+        return 'int'
+    if t == 'i64':
+        return 'int64_t'
+    if t == 'long':
+        return 'long'
+    if t in ('u32', 'unsigned int'):
+        return 'unsigned int'
+    if t == 'u16':
+        return 'uint16_t'
+    if t in ('u8', 'byte'):
+        return 'unsigned char'
+    if t in ('f32', 'float'):
+        return 'float'
+    if t in ('f64', 'double'):
+        return 'double'
+    if t.lower() in ('string', 'str', 'string*'):
+        return 'const char*'
+    if t == 'pointer' or t == 'void*':
+        return 'void*'
+    if t.startswith('byte['):
+        return 'uint8_t*'
+    return t
+
+
 def _generate_common_build_files(modules, outdir='out', target='linux'):
     os.makedirs(outdir, exist_ok=True)
     src_dir = os.path.join(outdir, 'src')
@@ -116,46 +163,17 @@ def _generate_common_build_files(modules, outdir='out', target='linux'):
         with open(os.path.join(outdir, 'manifest.json'), 'w', encoding='utf-8') as f:
             json.dump(manifest, f, indent=2)
 
-    def map_type(t):
-        if not t:
-            return 'void'
-        t = str(t)
-        if t.startswith('mut '):
-            base = t[len('mut '):]
-            return map_type(base) + '*'
-        if t.startswith('unsigned:'):
-            base = t[len('unsigned:'):]
-            if base == 'int':
-                return 'unsigned int'
-            return f'unsigned {base}'
-        if t in ('int', 'i32'):
-            return 'int32_t'
-        if t in ('i16', 'i8'):
-            return 'int'
-        if t in ('long', 'i64'):
-            return 'long'
-        if t in ('u32', 'unsigned int'):
-            return 'unsigned int'
-        if t in ('u16', 'u8', 'byte'):
-            return 'unsigned char'
-        if t in ('f32', 'float'):
-            return 'float'
-        if t in ('f64', 'double'):
-            return 'double'
-        if t.lower() in ('string', 'str', 'string*'):
-            return 'const char*'
-        if t == 'pointer' or t == 'void*':
-            return 'void*'
-        if t.startswith('byte['):
-            return 'uint8_t*'
-        return t
-
     with open(os.path.join(inc_dir, 'main.h'), 'w', encoding='utf-8') as mh:
         mh.write('#pragma once\n')
         mh.write('#include <cstdint>\n')
         mh.write('#include <cstdio>\n')
         mh.write('\n// Forward declarations for common runtime/formatting types\n')
         mh.write('struct Formatter;\n')
+        mh.write('\n// Holder for `signal` values; listeners are dispatched by the runtime\n')
+        mh.write('template <typename T>\n')
+        mh.write('struct Signal {\n')
+        mh.write('  T value;\n')
+        mh.write('};\n\n')
         written_defs = set()
         for m in modules:
             for d in m.get('defs', []):
@@ -171,11 +189,11 @@ def _generate_common_build_files(modules, outdir='out', target='linux'):
                             if isinstance(fld.get('type'), dict):
                                 base = fld.get('type').get('base')
                                 if fld.get('type').get('array_length'):
-                                    ftype = f'{map_type(base)}*'
+                                    ftype = f'{_map_type(base)}*'
                                 else:
-                                    ftype = map_type(base)
+                                    ftype = _map_type(base)
                             else:
-                                ftype = map_type(fld.get('type'))
+                                ftype = _map_type(fld.get('type'))
                         else:
                             ftype = 'int'
                         mh.write(f'  {ftype} {fname};\n')
@@ -224,13 +242,13 @@ def _generate_common_build_files(modules, outdir='out', target='linux'):
             for d in m.get('defs', []):
                 if d.get('type') == 'fn':
                     header_info = d.get('header') or {}
-                    ret = map_type(header_info.get('ret')) if header_info.get('ret') else (map_type(d.get('ret_type')) if d.get('ret_type') else 'void')
+                    ret = _map_type(header_info.get('ret')) if header_info.get('ret') else (_map_type(d.get('ret_type')) if d.get('ret_type') else 'void')
                     args = []
                     for a in (d.get('args') or []):
                         if a.get('vararg'):
                             args.append('...')
                         else:
-                            args.append(f"{map_type(a.get('type'))} {a.get('name') or 'arg'}")
+                            args.append(f"{_map_type(a.get('type'))} {a.get('name') or 'arg'}")
                     fn_ident = header_info.get('ident') or d.get('name')
                     if not header_info.get('ident') and d.get('owner'):
                         fn_ident = f"{d.get('owner')}_{fn_ident}"
@@ -239,19 +257,25 @@ def _generate_common_build_files(modules, outdir='out', target='linux'):
                         hh.write(f'namespace {ns} {{ {ret} {ident_name}({", ".join(args)}); }}\n')
                     else:
                         hh.write(f'{ret} {fn_ident}({", ".join(args)});\n')
+                if d.get('type') == 'const':
+                    ctype = _map_type(d.get('elem_type'))
+                    if 'values' in d:
+                        hh.write(f'extern const {ctype} {d.get("name")}[{len(d.get("values"))}];\n')
+                    else:
+                        hh.write(f'extern const {ctype} {d.get("name")};\n')
         with open(cpp_path, 'w', encoding='utf-8') as cc:
             cc.write('#include "main.h"\n')
             cc.write(f'#include "{base}.h"\n\n')
             for d in m.get('defs', []):
                 if d.get('type') == 'fn':
                     header_info = d.get('header') or {}
-                    ret = map_type(header_info.get('ret')) if header_info.get('ret') else (map_type(d.get('ret_type')) if d.get('ret_type') else 'void')
+                    ret = _map_type(header_info.get('ret')) if header_info.get('ret') else (_map_type(d.get('ret_type')) if d.get('ret_type') else 'void')
                     args = []
                     for a in (d.get('args') or []):
                         if a.get('vararg'):
                             args.append('...')
                         else:
-                            args.append(f"{map_type(a.get('type'))} {a.get('name') or 'arg'}")
+                            args.append(f"{_map_type(a.get('type'))} {a.get('name') or 'arg'}")
                     fn_ident = header_info.get('ident') or d.get('name')
                     if not header_info.get('ident') and d.get('owner'):
                         fn_ident = f"{d.get('owner')}_{fn_ident}"
@@ -274,22 +298,22 @@ def _generate_common_build_files(modules, outdir='out', target='linux'):
                                     if isinstance(fld.get('type'), dict):
                                         base = fld.get('type').get('base')
                                         if fld.get('type').get('array_length'):
-                                            ftype = f'{map_type(base)}*'
+                                            ftype = f'{_map_type(base)}*'
                                         else:
-                                            ftype = map_type(base)
+                                            ftype = _map_type(base)
                                     else:
-                                        ftype = map_type(fld.get('type'))
+                                        ftype = _map_type(fld.get('type'))
                                 hh.write(f'  {ftype} {fname};\n')
                             hh.write('};\n\n')
                         if mbr.get('type') == 'fn':
                             header_info = mbr.get('header') or {}
-                            ret = map_type(header_info.get('ret')) if header_info.get('ret') else (map_type(mbr.get('ret_type')) if mbr.get('ret_type') else 'void')
+                            ret = _map_type(header_info.get('ret')) if header_info.get('ret') else (_map_type(mbr.get('ret_type')) if mbr.get('ret_type') else 'void')
                             args = []
                             for a in (mbr.get('args') or []):
                                 if a.get('vararg'):
                                     args.append('...')
                                 else:
-                                    args.append(f"{map_type(a.get('type'))} {a.get('name') or 'arg'}")
+                                    args.append(f"{_map_type(a.get('type'))} {a.get('name') or 'arg'}")
                             fn_ident = header_info.get('ident') or mbr.get('name')
                             if not header_info.get('ident') and d.get('name'):
                                 fn_ident = f"{d.get('name')}_{fn_ident}"
@@ -303,6 +327,16 @@ def _generate_common_build_files(modules, outdir='out', target='linux'):
                                 else:
                                     cc.write('  return ({})0;\n'.format(ret))
                             cc.write('}\n\n')
+                if d.get('type') == 'const':
+                    ctype = _map_type(d.get('elem_type'))
+                    if 'values' in d:
+                        cc.write(f'const {ctype} {d.get("name")}[{len(d.get("values"))}] = ' + '{\n')
+                        values = [_format_const_value(v, ctype) for v in d.get('values')]
+                        for k in range(0, len(values), 8):
+                            cc.write('  ' + ', '.join(values[k:k + 8]) + ',\n')
+                        cc.write('};\n\n')
+                    else:
+                        cc.write(f'const {ctype} {d.get("name")} = {_format_const_value(d.get("value"), ctype)};\n\n')
                 if d.get('type') == 'val':
                     if isinstance(d.get('expr'), list) and len(d.get('expr')) == 1 and isinstance(d.get('expr')[0], str):
                         cc.write(f'const auto {d.get("name")} = std::string("{d.get("expr")[0]}");\n')
@@ -384,6 +418,13 @@ def _generate_common_build_files(modules, outdir='out', target='linux'):
     print(f'Common build files written to {outdir}')
 
 
+def _format_const_value(value, ctype):
+    if ctype in ('float', 'double'):
+        text = repr(float(value))
+        return text + 'f' if ctype == 'float' else text
+    return str(int(value))
+
+
 def _generate_pros_callbacks(modules, outdir):
     src_dir = os.path.join(outdir, 'src')
     inc_dir = os.path.join(outdir, 'include')
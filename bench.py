@@ -0,0 +1,266 @@
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+from typing import Dict, List, Any, Optional
+
+from backend import CodeGeneratorCPPLinuxX86_64, _map_type
+from compiler import build_ir_from_files
+
+
+DEFAULT_PROGRAMS = ['examples', 'lib/pros']
+DEFAULT_BASELINE = 'bench_baseline.json'
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_ITERATIONS = 2000000
+DEFAULT_REPEATS = 5
+
+# Programs the C++ backend cannot emit valid code for yet, with the reason printed on every run.
+EXCLUDED_PROGRAMS = {
+    'lib/pros/alllib/ui_natives.rt': 'uses map/vec/function/Self types the C++ backend cannot emit yet',
+}
+
+
+def find_programs(paths: List[str]) -> List[str]:
+    programs = []
+    for p in paths:
+        if os.path.isdir(p):
+            for root, dirs, files in os.walk(p):
+                dirs.sort()
+                programs.extend(os.path.join(root, f) for f in sorted(files) if f.endswith('.rt'))
+        elif os.path.exists(p):
+            programs.append(p)
+        else:
+            raise FileNotFoundError(p)
+    return programs
+
+
+def _module_files(module_name: str):
+    base = module_name.replace('.', '_')
+    return (f'{base}.h' if base != 'main' else 'module_main.h'), f'{base}.cpp'
+
+
+def _fn_ident(d: Dict[str, Any]) -> str:
+    header_info = d.get('header') or {}
+    fn_ident = header_info.get('ident') or d.get('name')
+    if not header_info.get('ident') and d.get('owner'):
+        fn_ident = f"{d.get('owner')}_{fn_ident}"
+    return fn_ident
+
+
+def _native_stubs(lib_dirs: List[str]) -> List[str]:
+    # c:struct declarations name PROS enums that only exist on the brain; stand them in with int32_t on the host
+    names = []
+    for path in find_programs([lib for lib in lib_dirs if os.path.isdir(lib)]):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                m = re.match(r'c:struct\s+(\w+)', line.strip())
+                if m and m.group(1) not in names:
+                    names.append(m.group(1))
+    return names
+
+
+def _write_driver(path: str, headers: List[str], fns: List[Dict[str, Any]], iterations: int, repeats: int):
+    with open(path, 'w', encoding='utf-8') as bd:
+        bd.write('#include <chrono>\n')
+        bd.write('#include <cstdio>\n')
+        bd.write('#include "main.h"\n')
+        for h in headers:
+            bd.write(f'#include "{h}"\n')
+        bd.write('\n')
+        bd.write('template <typename T>\n')
+        bd.write('static inline void bench_consume(const T& value) {\n')
+        bd.write('  asm volatile("" : : "g"(&value) : "memory");\n')
+        bd.write('}\n\n')
+        bd.write('int main() {\n')
+        bd.write(f'  const long iterations = {iterations};\n')
+        bd.write(f'  const int repeats = {repeats};\n')
+        for fn in fns:
+            call = f'{fn["ident"]}({", ".join("{}" for _ in fn["args"])})'
+            bd.write('  {\n')
+            bd.write('    double best = 0.0;\n')
+            bd.write('    for (int r = 0; r < repeats; ++r) {\n')
+            bd.write('      auto start = std::chrono::steady_clock::now();\n')
+            bd.write('      for (long n = 0; n < iterations; ++n) {\n')
+            if fn['ret'] == 'void':
+                bd.write(f'        {call};\n')
+                bd.write('        asm volatile("" : : : "memory");\n')
+            else:
+                bd.write(f'        bench_consume({call});\n')
+            bd.write('      }\n')
+            bd.write('      double secs = std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();\n')
+            bd.write('      if (secs > 0.0 && iterations / secs > best) best = iterations / secs;\n')
+            bd.write('    }\n')
+            bd.write(f'    std::printf("%s %.1f\\n", "{fn["key"]}", best);\n')
+            bd.write('  }\n')
+        bd.write('  return 0;\n')
+        bd.write('}\n')
+
+
+def _select_functions(ir: Dict[str, Any], seen: set):
+    """Pick the emitted functions to time from `ir`, skipping ones already benchmarked.
+    Returns the module headers, module sources and function entries for the driver.
+    """
+    headers, srcs, fns = [], [], []
+    for m in ir.get('modules', []):
+        header_name, cpp_name = _module_files(m.get('module', 'module'))
+        if cpp_name not in srcs:
+            headers.append(header_name)
+            srcs.append(cpp_name)
+        # 'fn' is the parser's fallback name for headers it could not read (e.g. `def default() =`)
+        fn_defs = [d for d in m.get('defs', []) if d.get('type') == 'fn' and d.get('name') != 'fn']
+        idents = [_fn_ident(d) for d in fn_defs]
+        for d, ident in zip(fn_defs, idents):
+            key = f'{m.get("module")}/{ident}'
+            # overloads cannot be called unambiguously with value-initialised arguments
+            if key in seen or key in (fn['key'] for fn in fns) or idents.count(ident) > 1 or any(a.get('vararg') for a in (d.get('args') or [])):
+                continue
+            header_info = d.get('header') or {}
+            ret = _map_type(header_info.get('ret')) if header_info.get('ret') else (_map_type(d.get('ret_type')) if d.get('ret_type') else 'void')
+            fns.append({'key': key, 'ident': ident, 'args': d.get('args') or [], 'ret': ret})
+    return headers, srcs, fns
+
+
+def bench_program(program: str, outdir: str, lib_dirs: List[str], seen: set,
+                  iterations: int = DEFAULT_ITERATIONS, repeats: int = DEFAULT_REPEATS) -> Dict[str, float]:
+    """Build one program for the elf target and time every emitted function not already benchmarked.
+    Returns calls per second keyed by `module/function`.
+    """
+    ir = build_ir_from_files([program], lib_dirs=lib_dirs)
+    gen = CodeGeneratorCPPLinuxX86_64()
+    gen.compile_native = False
+    gen.generate_code(ir, outdir=outdir)
+
+    headers, srcs, fns = _select_functions(ir, seen)
+    if not fns:
+        return {}
+
+    stubs_h = os.path.join(outdir, 'include', 'bench_natives.h')
+    with open(stubs_h, 'w', encoding='utf-8') as sh:
+        sh.write('#pragma once\n')
+        sh.write('#include <cstdint>\n')
+        for name in _native_stubs(lib_dirs):
+            sh.write(f'typedef int32_t {name};\n')
+    driver = os.path.join(outdir, 'bench_main.cpp')
+    _write_driver(driver, headers, fns, iterations, repeats)
+
+    cxx = shutil.which('g++') or shutil.which('clang++')
+    if not cxx:
+        raise RuntimeError('No supported C++ compiler found (g++ or clang++).')
+    os.makedirs(os.path.join(outdir, 'bin'), exist_ok=True)
+    outbin = os.path.join(outdir, 'bin', 'bench')
+    cmd = [cxx, '-std=c++17', '-O2', '-I' + os.path.join(outdir, 'include'), '-include', stubs_h, '-o', outbin, driver]
+    cmd += [os.path.join(outdir, 'src', s) for s in srcs]
+    subprocess.run(cmd, check=True, capture_output=True, text=True)
+    run = subprocess.run([outbin], check=True, capture_output=True, text=True)
+
+    results = {}
+    for line in run.stdout.splitlines():
+        key, rate = line.rsplit(' ', 1)
+        results[key] = float(rate)
+    return results
+
+
+def host_info() -> Dict[str, str]:
+    return {
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'cxx': os.path.basename(shutil.which('g++') or shutil.which('clang++') or ''),
+    }
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float, check_missing: bool = True):
+    """Split differences against the baseline into hard failures (functions that disappeared)
+    and slowdowns beyond `threshold`.
+    """
+    missing, slowdowns = [], []
+    for key, base_rate in sorted(baseline.items()):
+        rate = results.get(key)
+        if rate is None:
+            if check_missing:
+                missing.append(f'{key}: missing (baseline {base_rate:.0f} calls/s)')
+        elif rate < base_rate * (1.0 - threshold):
+            slowdowns.append(f'{key}: {rate:.0f} calls/s vs baseline {base_rate:.0f} ({(rate / base_rate - 1.0) * 100:+.1f}%)')
+    return missing, slowdowns
+
+
+def run_benchmarks(programs: Optional[List[str]] = None, outdir: str = 'out/bench', lib_dirs: Optional[List[str]] = None,
+                   baseline_path: str = DEFAULT_BASELINE, threshold: float = DEFAULT_THRESHOLD,
+                   iterations: int = DEFAULT_ITERATIONS, repeats: int = DEFAULT_REPEATS,
+                   update_baseline: bool = False, fail_on_slowdown: bool = False) -> List[str]:
+    """Benchmark the programs and compare against (or record) the baseline.
+    Returns the failures; an empty list means the run is clean.
+    """
+    lib_dirs = lib_dirs or ['lib']
+    settings = {'iterations': iterations, 'repeats': repeats}
+    failures = []
+    results = {}
+    seen = set()
+    for program in find_programs(programs or DEFAULT_PROGRAMS):
+        reason = EXCLUDED_PROGRAMS.get(os.path.relpath(program).replace(os.sep, '/'))
+        if reason:
+            print(f'SKIPPED {program}: {reason}')
+            continue
+        prog_out = os.path.join(outdir, os.path.splitext(program.replace(os.sep, '_'))[0])
+        try:
+            prog_results = bench_program(program, prog_out, lib_dirs, seen, iterations=iterations, repeats=repeats)
+        except subprocess.CalledProcessError as e:
+            detail = [l for l in (e.stderr or '').splitlines() if 'error' in l] or (e.stderr or '').strip().splitlines()
+            failures.append(f'{program}: build or run failed: {detail[0].strip() if detail else e}')
+            continue
+        except Exception as e:
+            failures.append(f'{program}: {e}')
+            continue
+        seen.update(prog_results)
+        results.update(prog_results)
+
+    print('Note: generated function bodies are still stubs, so these rates measure call overhead only.')
+    for key, rate in sorted(results.items()):
+        print(f'{key:<40} {rate:>16,.0f} calls/s')
+    for f in failures:
+        print(f'FAILED {f}')
+    if not results and not failures:
+        failures.append('no functions were benchmarked')
+
+    if update_baseline:
+        if failures:
+            print(f'Baseline not written to {baseline_path}: {len(failures)} failure(s)')
+            return failures
+        stored = {}
+        if programs and os.path.exists(baseline_path):
+            # a partial run only refreshes the functions it measured
+            with open(baseline_path, encoding='utf-8') as f:
+                old = json.load(f)
+            if old.get('settings') != settings or old.get('host') != host_info():
+                failures.append(f'{baseline_path} was recorded with {old.get("settings")} on {old.get("host")}, '
+                                f'not {settings} on {host_info()}; re-record it with a full run')
+                print(f'FAILED {failures[-1]}')
+                return failures
+            stored = old.get('results', {})
+        stored.update(results)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump({'host': host_info(), 'settings': settings, 'results': stored}, f, indent=2, sort_keys=True)
+        print(f'Baseline written to {baseline_path}')
+        return failures
+    if not os.path.exists(baseline_path):
+        print(f'No baseline at {baseline_path}; run with --update-baseline to record one.')
+        return failures
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    # rates are only comparable when measured the same way on the same kind of host
+    if baseline.get('settings') != settings or baseline.get('host') != host_info():
+        failures.append(f'{baseline_path} was recorded with {baseline.get("settings")} on {baseline.get("host")}, '
+                        f'this run uses {settings} on {host_info()}; not comparing')
+        print(f'FAILED {failures[-1]}')
+        return failures
+    missing, slowdowns = compare(results, baseline.get('results', {}), threshold, check_missing=not programs)
+    for m in missing:
+        print(f'FAILED {m}')
+    for r in slowdowns:
+        print(f'SLOWER {r}')
+    if slowdowns and not fail_on_slowdown:
+        print('Slowdowns are advisory while bodies are stubs; pass --fail-on-slowdown to fail on them.')
+    if not missing and not slowdowns:
+        print(f'No slowdowns beyond {threshold:.0%} against {baseline_path}')
+    return failures + missing + (slowdowns if fail_on_slowdown else [])
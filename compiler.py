@@ -2,6 +2,8 @@ import os
 import re
 from typing import Dict, List, Any, Optional
 
+from comptime import resolve_consts
+
 
 class Macro:
     def __init__(self, name: str):
@@ -14,18 +16,22 @@ class RTModuleParser:
         self.lib_dirs = lib_dirs or ['lib']
         self.macros = {}
 
-    def find_file(self, include_name: str) -> Optional[str]:
+    def find_file(self, include_name: str, base_dir: Optional[str] = None) -> Optional[str]:
         include_name = include_name.strip()
         if include_name.startswith('<') and include_name.endswith('>'):
             include_name = include_name[1:-1]
         if include_name.startswith('rt/'):
             include_name = include_name[len('rt/'):]
-        for lib in self.lib_dirs:
+        # siblings of the including file win over the library directories
+        search_dirs = ([base_dir] if base_dir else []) + self.lib_dirs
+        for lib in search_dirs:
             path = os.path.join(lib, include_name + '.rt')
             if os.path.exists(path):
                 return path
-        for lib in self.lib_dirs:
+        for lib in search_dirs:
             path = os.path.join(lib, include_name)
+            if os.path.isdir(path):
+                path = os.path.join(path, 'mod.rt')
             if os.path.exists(path):
                 return path
         return None
@@ -47,11 +53,13 @@ class RTModuleParser:
                 if not line or line.startswith('#'):
                     i += 1
                     continue
+                if '@const' in pending_annotations and not (line.startswith('@') or line.startswith('def ')):
+                    raise ValueError(f'{fpath}:{i + 1}: @const must be followed by a def')
                 if line.startswith('include '):
                     inc = line.split(' ', 1)[1].strip()
                     if inc.startswith('<') and inc.endswith('>'):
                         inc = inc[1:-1]
-                    path = self.find_file(inc)
+                    path = self.find_file(inc, os.path.dirname(fpath))
                     if path:
                         visit(path)
                     i += 1
@@ -104,6 +112,12 @@ class RTModuleParser:
                     match = re.match(r'into\s+(\w+).*', line)
                     target = match.group(1) if match else None
                     i += 1
+                    j = i
+                    while j < len(lines) and lines[j].startswith('  '):
+                        l = lines[j].strip()
+                        if l == '@const' or l.startswith('comptime def '):
+                            raise ValueError(f'{fpath}:{j + 1}: @const is only supported on top-level functions, not inside into {target}')
+                        j += 1
                     while i < len(lines) and lines[i].startswith('  '):
                         l = lines[i].strip()
                         if l.startswith('def '):
@@ -121,10 +135,21 @@ class RTModuleParser:
                             continue
                         i += 1
                     continue
-                if line.startswith('def '):
+                if line.startswith('const '):
+                    m = re.match(r'const\s+(\w+)\s*=\s*(.+)', line)
+                    if m:
+                        module['defs'].append({'type': 'const', 'name': m.group(1), 'rhs': m.group(2)})
+                    i += 1
+                    continue
+                if line.startswith('def ') or line.startswith('comptime def '):
                     fn = self._parse_def(lines, i)
-                    i += fn['lines_consumed']
                     fn['type'] = 'fn'
+                    if line.startswith('comptime ') or '@const' in pending_annotations:
+                        fn['type'] = 'comptime'
+                        fn['body'] = [l.strip() for l in lines[i + 1:i + fn['lines_consumed']] if l.strip() and not l.strip().startswith('#')]
+                        if '@const' in pending_annotations:
+                            pending_annotations.remove('@const')
+                    i += fn['lines_consumed']
                     if pending_annotations:
                         fn['annotations'] = pending_annotations.copy()
                         pending_annotations.clear()
@@ -134,6 +159,8 @@ class RTModuleParser:
                     module['defs'].append(fn)
                     continue
                 i += 1
+            if '@const' in pending_annotations:
+                raise ValueError(f'{fpath}: @const at the end of the file is not followed by a def')
             modules.append(module)
         for f in files:
             if not os.path.exists(f):
@@ -143,9 +170,20 @@ class RTModuleParser:
 
     def _parse_def(self, lines: List[str], start: int) -> Dict[str, Any]:
         header = lines[start].strip()
-        m = re.match(r'def\s+(\w+)\s*\[(.*)\]', header)
+        m = re.match(r'(?:comptime\s+)?def\s+(\w+)\s*\[', header)
         name = m.group(1) if m else 'fn'
-        args_str = m.group(2) if m else ''
+        args_str = ''
+        if m:
+            # match the bracket that opened the argument list; the body may contain brackets of its own
+            depth = 0
+            for k in range(m.end() - 1, len(header)):
+                if header[k] == '[':
+                    depth += 1
+                elif header[k] == ']':
+                    depth -= 1
+                    if depth == 0:
+                        args_str = header[m.end():k]
+                        break
         args = []
         if args_str.strip():
             for a in args_str.split(','):
@@ -162,8 +200,10 @@ class RTModuleParser:
         if arrow:
             ret = arrow.group(1)
 
+        # the body ends at the first line indented no deeper than the def itself, e.g. the next def in an into block
+        indent = len(lines[start]) - len(lines[start].lstrip())
         i = start + 1
-        while i < len(lines) and (lines[i].startswith('  ') or not lines[i].strip()):
+        while i < len(lines) and (not lines[i].strip() or len(lines[i]) - len(lines[i].lstrip()) > indent):
             i += 1
         return {'name': name, 'args': args, 'ret_type': ret, 'lines_consumed': i - start}
 
@@ -177,6 +217,7 @@ def build_ir_from_files(files: List[str], lib_dirs: Optional[List[str]] = None)
                 for ann in d['annotations']:
                     if ann in parser.macros:
                         d.setdefault('header', {}).update(parser.macros[ann].header)
+    resolve_consts(ir)
     return ir
 
 
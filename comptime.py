@@ -0,0 +1,247 @@
+import ast
+import functools
+import math
+import re
+from typing import Dict, List, Any, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Tables at least this long are evaluated in one vectorized pass when numpy is available.
+VECTORIZE_THRESHOLD = 64
+
+_FLOAT_TYPES = ('f32', 'f64', 'float', 'double')
+
+_F32_MAX = 3.4028234663852886e38
+
+# Past 2**53 float64 can no longer hold every integer, so the vector path would round what the scalar path keeps exact.
+_FLOAT64_EXACT = 2 ** 53
+
+# 'long' is only guaranteed 32 bits wide, which is what it is on the V5 brain.
+_INT_RANGES = {
+    'bool': (0, 1),
+    'i8': (-2 ** 7, 2 ** 7 - 1),
+    'i16': (-2 ** 15, 2 ** 15 - 1),
+    'i32': (-2 ** 31, 2 ** 31 - 1),
+    'int': (-2 ** 31, 2 ** 31 - 1),
+    'long': (-2 ** 31, 2 ** 31 - 1),
+    'i64': (-2 ** 63, 2 ** 63 - 1),
+    'u8': (0, 2 ** 8 - 1),
+    'byte': (0, 2 ** 8 - 1),
+    'u16': (0, 2 ** 16 - 1),
+    'u32': (0, 2 ** 32 - 1),
+}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.operator, ast.unaryop, ast.cmpop,
+)
+
+# numpy disagrees with Python scalars on these (bitwise ops on a float index, truthiness of arrays),
+# so expressions using them always take the scalar path.
+_SCALAR_ONLY_NODES = (
+    ast.BitAnd, ast.BitOr, ast.BitXor, ast.LShift, ast.RShift, ast.Invert, ast.Not, ast.MatMult,
+)
+
+_CONSTANTS = {'pi': math.pi, 'tau': math.tau, 'e': math.e}
+
+
+def _reduce(fn):
+    return lambda *xs: functools.reduce(fn, xs)
+
+
+_SCALAR_BUILTINS = {
+    'sin': math.sin, 'cos': math.cos, 'tan': math.tan,
+    'asin': math.asin, 'acos': math.acos, 'atan': math.atan, 'atan2': math.atan2,
+    'sqrt': math.sqrt, 'exp': math.exp, 'log': math.log, 'pow': math.pow,
+    'abs': abs, 'floor': math.floor, 'ceil': math.ceil, 'round': round,
+    'min': min, 'max': max,
+    'clamp': lambda x, lo, hi: min(max(x, lo), hi),
+    'select': lambda cond, a, b: a if cond else b,
+    'f32': float, 'f64': float, 'i32': int,
+}
+
+if np is not None:
+    _VECTOR_BUILTINS = {
+        'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+        'asin': np.arcsin, 'acos': np.arccos, 'atan': np.arctan, 'atan2': np.arctan2,
+        'sqrt': np.sqrt, 'exp': np.exp, 'log': np.log, 'pow': np.power,
+        'abs': np.abs, 'floor': np.floor, 'ceil': np.ceil, 'round': np.round,
+        'min': _reduce(np.minimum), 'max': _reduce(np.maximum),
+        'clamp': np.clip,
+        'select': np.where,
+        'f32': lambda x: x, 'f64': lambda x: x, 'i32': np.trunc,
+    }
+else:
+    _VECTOR_BUILTINS = {}
+
+
+def _parse_expr(src: str, where: str) -> ast.Expression:
+    try:
+        tree = ast.parse(src.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f'{where}: cannot parse expression {src.strip()!r}: {e.msg}')
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f'{where}: {type(node).__name__} is not allowed in compile-time expressions')
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in _SCALAR_BUILTINS or node.keywords:
+                raise ValueError(f'{where}: only builtin calls are allowed at compile time, got {ast.unparse(node)!r}')
+    return tree
+
+
+def _compile_expr(src: str, where: str):
+    return compile(_parse_expr(src, where), where, 'eval')
+
+
+def _split_args(src: str, where: str) -> List[str]:
+    if not src.strip():
+        return []
+    try:
+        tree = ast.parse(f'({src},)', mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f'{where}: cannot parse arguments {src.strip()!r}: {e.msg}')
+    return [ast.unparse(elt) for elt in tree.body.elts]
+
+
+def _vectorizable(tree: ast.Expression) -> bool:
+    for node in ast.walk(tree):
+        if isinstance(node, _SCALAR_ONLY_NODES):
+            return False
+        if isinstance(node, ast.Compare) and len(node.ops) > 1:
+            return False
+    return True
+
+
+def _eval(code, env: Dict[str, Any], builtins: Dict[str, Any], where: str):
+    try:
+        return eval(code, {'__builtins__': {}}, {**_CONSTANTS, **builtins, **env})
+    except (ArithmeticError, ValueError, TypeError, NameError) as e:
+        raise ValueError(f'{where}: {e}') from e
+
+
+def _convert(value: Any, elem_type: str, where: str):
+    try:
+        if not math.isfinite(value):
+            raise ValueError(f'{where}: non-finite value {value}')
+        if elem_type in _FLOAT_TYPES:
+            if elem_type in ('f32', 'float') and abs(value) > _F32_MAX:
+                raise ValueError(f'{where}: value {value} does not fit in {elem_type}')
+            return float(value)
+    except (OverflowError, TypeError) as e:
+        raise ValueError(f'{where}: {e}') from e
+    if elem_type not in _INT_RANGES:
+        raise ValueError(f'{where}: unsupported element type {elem_type}')
+    value = int(value)
+    lo, hi = _INT_RANGES[elem_type]
+    if not lo <= value <= hi:
+        raise ValueError(f'{where}: value {value} does not fit in {elem_type} ({lo}..{hi})')
+    return value
+
+
+def _eval_table(fname: str, index: str, start: int, stop: int, expr: str, env: Dict[str, Any]) -> List[Any]:
+    where = f'@const {fname}'
+    tree = _parse_expr(expr, where)
+    code = compile(tree, where, 'eval')
+    count = stop - start
+    if count <= 0:
+        raise ValueError(f'{where}: table range {start}..{stop} is empty')
+    if np is not None and count >= VECTORIZE_THRESHOLD and _vectorizable(tree):
+        idx = np.arange(start, stop, dtype=np.float64)
+        try:
+            with np.errstate(all='ignore'):
+                result = _eval(code, {**env, index: idx}, _VECTOR_BUILTINS, where)
+                values = np.broadcast_to(np.asarray(result, dtype=np.float64), (count,))
+            # non-finite results are re-run element by element so the error names the failing index,
+            # and large ones so integers stay exact
+            if np.all(np.isfinite(values)) and np.abs(values).max() < _FLOAT64_EXACT:
+                return values.tolist()
+        except ValueError:
+            pass
+    return [_eval(code, {**env, index: k}, _SCALAR_BUILTINS, f'{where} at {index}={k}') for k in range(start, stop)]
+
+
+def evaluate_comptime(fn: Dict[str, Any], args: Optional[List[Any]] = None) -> Dict[str, Any]:
+    """Run a `@const` function on the host and return its value as a `const` IR def.
+    Tables produce a `values` list, anything else a single `value`.
+    """
+    fname = fn.get('name')
+    where = f'@const {fname}'
+    params = [a.get('name') for a in (fn.get('args') or [])]
+    args = list(args or [])
+    if len(args) != len(params):
+        raise ValueError(f'{where} expects {len(params)} argument(s), got {len(args)}')
+    env = dict(zip(params, args))
+    body = fn.get('body') or []
+    if not body:
+        raise ValueError(f'{where} has an empty body')
+    elem_type = fn.get('ret_type') or 'f32'
+    result: Dict[str, Any] = {'type': 'const', 'name': fname, 'elem_type': elem_type}
+    for n, stmt in enumerate(body):
+        last = n == len(body) - 1
+        tm = re.match(r'table\s*\[\s*(\w+)\s+in\s+(.+?)\.\.(.+?)\s*\]\s*=\s*(.+)$', stmt)
+        if tm:
+            if not last:
+                raise ValueError(f'{where}: a table must be the last statement')
+            start = int(_eval(_compile_expr(tm.group(2), where), env, _SCALAR_BUILTINS, where))
+            stop = int(_eval(_compile_expr(tm.group(3), where), env, _SCALAR_BUILTINS, where))
+            values = _eval_table(fname, tm.group(1), start, stop, tm.group(4), env)
+            result['values'] = [_convert(v, elem_type, f'{where} at index {k}') for k, v in enumerate(values)]
+            break
+        am = re.match(r'(\w+)\s*=(?!=)\s*(.+)$', stmt)
+        if am and not last:
+            env[am.group(1)] = _eval(_compile_expr(am.group(2), where), env, _SCALAR_BUILTINS, where)
+            continue
+        if not last:
+            raise ValueError(f'{where}: expected a binding, got {stmt!r}')
+        result['value'] = _convert(_eval(_compile_expr(stmt, where), env, _SCALAR_BUILTINS, where), elem_type, where)
+    return result
+
+
+def _resolve_const_decl(d: Dict[str, Any], comptime_fns: Dict[str, Any], scope: Dict[str, Any]) -> Dict[str, Any]:
+    name = d.get('name')
+    rhs = d.get('rhs', '').strip()
+    where = f'const {name}'
+    # `const NAME = fn arg, ...` calls a @const function, anything else is a plain expression
+    m = re.match(r'([A-Za-z_][\w.]*)(?:\s+(.*))?$', rhs)
+    if m and m.group(1) in comptime_fns:
+        call_args = [_eval(_compile_expr(a, where), scope, _SCALAR_BUILTINS, where) for a in _split_args(m.group(2) or '', where)]
+        resolved = evaluate_comptime(comptime_fns[m.group(1)], call_args)
+        resolved['name'] = name
+        resolved['source'] = m.group(1)
+        return resolved
+    try:
+        code = _compile_expr(rhs, where)
+    except ValueError:
+        if m and m.group(2):
+            raise ValueError(f'{where}: {m.group(1)} is not a @const function')
+        raise
+    value = _eval(code, scope, _SCALAR_BUILTINS, where)
+    elem_type = 'i32' if isinstance(value, int) else 'f32'
+    return {'type': 'const', 'name': name, 'elem_type': elem_type, 'value': _convert(value, elem_type, where)}
+
+
+def resolve_consts(ir: Dict[str, Any]) -> Dict[str, Any]:
+    """Evaluate every `@const` function and `const` declaration in the IR in place."""
+    comptime_fns = {}
+    for module in ir.get('modules', []):
+        for d in module.get('defs', []):
+            if d.get('type') == 'comptime':
+                comptime_fns[d.get('name')] = d
+
+    scope = {}
+    for module in ir.get('modules', []):
+        defs = []
+        for d in module.get('defs', []):
+            if d.get('type') == 'const' and 'rhs' in d:
+                d = _resolve_const_decl(d, comptime_fns, scope)
+            defs.append(d)
+            if d.get('type') == 'comptime' and not d.get('args'):
+                defs.append(evaluate_comptime(d))
+            if defs[-1].get('type') == 'const' and 'value' in defs[-1]:
+                scope[defs[-1].get('name')] = defs[-1].get('value')
+        module['defs'] = defs
+    return ir
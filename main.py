@@ -7,6 +7,7 @@ import subprocess
 import shutil
 from backend import CodeGeneratorIR, _compile_native_project
 from compiler import build_ir_from_files
+from bench import run_benchmarks, DEFAULT_BASELINE, DEFAULT_THRESHOLD, DEFAULT_ITERATIONS, DEFAULT_REPEATS
 
 def build_command(args):
 	files = args.files
@@ -38,6 +39,21 @@ def build_command(args):
 				print('PROS CLI not found; skipping compilation for target pros.')
 
 
+def bench_command(args):
+	failures = run_benchmarks(
+		programs=args.programs or None,
+		outdir=args.outdir,
+		lib_dirs=['lib'],
+		baseline_path=args.baseline,
+		threshold=args.threshold,
+		iterations=args.iterations,
+		repeats=args.repeats,
+		update_baseline=args.update_baseline,
+		fail_on_slowdown=args.fail_on_slowdown,
+	)
+	if failures:
+		raise SystemExit(1)
+
 def main():
 	parser = argparse.ArgumentParser(prog='rolltide')
 	sub = parser.add_subparsers(dest='command')
@@ -46,9 +62,20 @@ def main():
 	buildp.add_argument('-t', '--target', choices=['pe', 'elf', 'pros'], default='pros')
 	buildp.add_argument('-o', '--outdir', help='Output directory', default='out')
 	buildp.add_argument('--compile', action='store_true', help='Attempt to compile native binaries after generating code')
+	benchp = sub.add_parser('bench', help='Benchmark generated elf code against a stored baseline')
+	benchp.add_argument('programs', nargs='*', help='RollTide sources or directories to benchmark (default: examples and lib/pros)')
+	benchp.add_argument('-b', '--baseline', help='Baseline results file', default=DEFAULT_BASELINE)
+	benchp.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Allowed slowdown as a fraction before flagging a regression')
+	benchp.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS, help='Calls per timed repeat')
+	benchp.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help='Timed repeats per function; the best one is kept')
+	benchp.add_argument('-o', '--outdir', help='Output directory for generated benchmark projects', default=os.path.join('out', 'bench'))
+	benchp.add_argument('--update-baseline', action='store_true', help='Record the current results as the new baseline')
+	benchp.add_argument('--fail-on-slowdown', action='store_true', help='Exit non-zero on slowdowns beyond the threshold, not only on build failures')
 	args = parser.parse_args()
 	if args.command == 'build':
 		build_command(args)
+	elif args.command == 'bench':
+		bench_command(args)
 	else:
 		parser.print_help()
 
@@ -0,0 +1,86 @@
+import json
+import os
+import shutil
+
+import pytest
+
+import bench
+from compiler import build_ir_from_files
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LIB = os.path.join(ROOT, 'lib')
+
+
+def test_compare_separates_missing_from_slowdowns():
+    baseline = {'pid/PID_new': 100.0, 'rt/delay': 100.0, 'motor/Motor_new': 100.0}
+    missing, slowdowns = bench.compare({'pid/PID_new': 50.0, 'rt/delay': 95.0}, baseline, 0.10)
+    assert missing == ['motor/Motor_new: missing (baseline 100 calls/s)']
+    assert slowdowns == ['pid/PID_new: 50 calls/s vs baseline 100 (-50.0%)']
+    assert bench.compare({}, baseline, 0.10, check_missing=False) == ([], [])
+
+
+def test_methods_from_into_blocks_are_benchmarked():
+    ir = build_ir_from_files([os.path.join(LIB, 'pros', 'alllib', 'pid.rt'), os.path.join(LIB, 'pros', 'motor.rt')], lib_dirs=[LIB])
+    headers, srcs, fns = bench._select_functions(ir, set())
+    keys = [fn['key'] for fn in fns]
+    assert 'pid/PID_update' in keys and 'pid/PID_start' in keys
+    assert 'motor/Motor_move_absolute' in keys
+    assert 'pid/PID_fn' not in keys
+    assert bench._select_functions(ir, set(keys))[2] == []
+
+
+@pytest.mark.skipif(not (shutil.which('g++') or shutil.which('clang++')), reason='needs a C++ compiler')
+def test_pid_program_builds_and_runs(tmp_path):
+    results = bench.bench_program(os.path.join(LIB, 'pros', 'alllib', 'pid.rt'), str(tmp_path), [LIB], set(), iterations=1000, repeats=1)
+    assert results['pid/PID_update'] > 0
+
+
+def test_failed_program_blocks_baseline_update(tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError('No supported C++ compiler found (g++ or clang++).')
+
+    monkeypatch.setattr(bench, 'bench_program', fail)
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text('{"results": {"pid/PID_new": 1.0}}', encoding='utf-8')
+    failures = bench.run_benchmarks(programs=['lib/pros/rt.rt'], outdir=str(tmp_path), baseline_path=str(baseline), update_baseline=True)
+    assert failures and 'No supported C++ compiler' in failures[0]
+    assert json.loads(baseline.read_text(encoding='utf-8')) == {'results': {'pid/PID_new': 1.0}}
+
+
+def test_mismatched_settings_are_not_compared(tmp_path, monkeypatch):
+    monkeypatch.setattr(bench, 'bench_program', lambda *args, **kwargs: {'rt/delay': 1.0})
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps({
+        'host': bench.host_info(),
+        'settings': {'iterations': 10, 'repeats': bench.DEFAULT_REPEATS},
+        'results': {'rt/delay': 1000.0},
+    }), encoding='utf-8')
+    failures = bench.run_benchmarks(programs=['lib/pros/rt.rt'], outdir=str(tmp_path), baseline_path=str(baseline))
+    assert len(failures) == 1 and 'not comparing' in failures[0]
+
+
+def test_partial_update_refuses_baseline_from_another_host(tmp_path, monkeypatch):
+    monkeypatch.setattr(bench, 'bench_program', lambda *args, **kwargs: {'rt/delay': 1.0})
+    baseline = tmp_path / 'baseline.json'
+    recorded = {
+        'host': {'machine': 'armv7l', 'system': 'Linux', 'cxx': 'g++'},
+        'settings': {'iterations': bench.DEFAULT_ITERATIONS, 'repeats': bench.DEFAULT_REPEATS},
+        'results': {'rt/delay': 1000.0},
+    }
+    baseline.write_text(json.dumps(recorded), encoding='utf-8')
+    failures = bench.run_benchmarks(programs=['lib/pros/rt.rt'], outdir=str(tmp_path), baseline_path=str(baseline), update_baseline=True)
+    assert len(failures) == 1 and 're-record it with a full run' in failures[0]
+    assert json.loads(baseline.read_text(encoding='utf-8')) == recorded
+
+
+def test_slowdowns_only_fail_when_asked(tmp_path, monkeypatch):
+    monkeypatch.setattr(bench, 'bench_program', lambda *args, **kwargs: {'rt/delay': 1.0})
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps({
+        'host': bench.host_info(),
+        'settings': {'iterations': bench.DEFAULT_ITERATIONS, 'repeats': bench.DEFAULT_REPEATS},
+        'results': {'rt/delay': 1000.0},
+    }), encoding='utf-8')
+    kwargs = {'programs': ['lib/pros/rt.rt'], 'outdir': str(tmp_path), 'baseline_path': str(baseline)}
+    assert bench.run_benchmarks(**kwargs) == []
+    assert len(bench.run_benchmarks(fail_on_slowdown=True, **kwargs)) == 1
@@ -0,0 +1,33 @@
+import os
+
+from compiler import RTModuleParser, build_ir_from_files
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LIB = os.path.join(ROOT, 'lib')
+
+
+def _fns(ir, module):
+    return [d for m in ir['modules'] if m['module'] == module for d in m['defs'] if d.get('type') == 'fn']
+
+
+def test_directory_include_resolves_to_mod():
+    parser = RTModuleParser(lib_dirs=[LIB])
+    assert parser.find_file('<rt/pros>') == os.path.join(LIB, 'pros', 'mod.rt')
+
+
+def test_include_prefers_siblings_of_the_including_file():
+    ir = build_ir_from_files([os.path.join(LIB, 'pros', 'alllib', 'imu.rt')], lib_dirs=[LIB])
+    assert [m['module'] for m in ir['modules']] == ['pid', 'imu']
+
+
+def test_args_stop_at_the_bracket_that_opened_them():
+    ir = build_ir_from_files([os.path.join(LIB, 'pros', 'rt.rt')], lib_dirs=[LIB])
+    assert [(d['name'], d['args']) for d in _fns(ir, 'rt')] == [('delay', [{'name': 'ms', 'type': 'i32'}])]
+
+
+def test_every_def_in_an_into_block_is_parsed():
+    ir = build_ir_from_files([os.path.join(LIB, 'pros', 'alllib', 'pid.rt')], lib_dirs=[LIB])
+    assert [d['name'] for d in _fns(ir, 'pid')] == ['new', 'start', 'update', 'fn', 'fmt']
+    update = _fns(ir, 'pid')[2]
+    assert update['owner'] == 'PID'
+    assert [a['type'] for a in update['args']] == ['PID', 'signal f32', 'signal f32', 'signal f32']
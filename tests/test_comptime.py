@@ -0,0 +1,138 @@
+import shutil
+import subprocess
+
+import pytest
+
+import comptime
+from backend import _generate_common_build_files
+from compiler import build_ir_from_files
+
+
+def _build(tmp_path, source):
+    path = tmp_path / 'consts.rt'
+    path.write_text(source, encoding='utf-8')
+    return build_ir_from_files([str(path)], lib_dirs=[str(tmp_path)])
+
+
+def _consts(ir):
+    return {d['name']: d for m in ir['modules'] for d in m['defs'] if d.get('type') == 'const'}
+
+
+def _table(body, ret_type='f32', args=None, values=None):
+    fn = {'name': 't', 'args': args or [], 'ret_type': ret_type, 'body': body}
+    return comptime.evaluate_comptime(fn, values)['values']
+
+
+@pytest.mark.parametrize('expr', [
+    'sin(tau * i / 256)',
+    'min(600.0, 40.0 * i, 40.0 * (255 - i))',
+    'select(i < 70, clamp(i * 2.0, 0, 100), 5)',
+    'i % 7 - i // 9',
+    'i & 1',
+    '(i << 2) ^ 3',
+    '0 < i < 10',
+    'i32(i / 3)',
+    ('i ** 9', 'i64'),
+])
+def test_vectorized_matches_scalar(monkeypatch, expr):
+    pytest.importorskip('numpy')
+    expr, ret_type = expr if isinstance(expr, tuple) else (expr, 'f32')
+    vectorized = _table([f'table [i in 0..128] = {expr}'], ret_type=ret_type)
+    monkeypatch.setattr(comptime, 'np', None)
+    scalar = _table([f'table [i in 0..128] = {expr}'], ret_type=ret_type)
+    assert vectorized == scalar
+
+
+def test_large_tables_take_the_vector_path(monkeypatch):
+    pytest.importorskip('numpy')
+
+    def scalar_sin(x):
+        raise AssertionError('scalar path used')
+
+    monkeypatch.setitem(comptime._SCALAR_BUILTINS, 'sin', scalar_sin)
+    assert len(_table(['table [i in 0..256] = sin(i)'])) == 256
+
+
+def test_short_and_long_tables_agree():
+    short = _table(['table [i in 0..8] = i & 1'], ret_type='i32')
+    long = _table(['table [i in 0..128] = i & 1'], ret_type='i32')
+    assert long[:8] == short == [0, 1, 0, 1, 0, 1, 0, 1]
+
+
+def test_int_elements_truncate_toward_zero():
+    assert _table(['table [i in -3..4] = i * 0.5'], ret_type='i32') == [-1, -1, 0, 0, 0, 1, 1]
+
+
+def test_bindings_and_args():
+    args = [{'name': 'steps', 'type': 'i32'}, {'name': 'v_max', 'type': 'f32'}]
+    values = _table(['ramp = v_max / 2', 'table [i in 0..steps] = min(v_max, ramp * i)'], ret_type='i32', args=args, values=[4, 100.0])
+    assert values == [0, 50, 100, 100]
+
+
+def test_const_declarations(tmp_path):
+    ir = _build(tmp_path, '\n'.join([
+        '@const',
+        'def scaled [x: f32] -> f32 =',
+        '    x * 2',
+        '',
+        'const LIMIT = 5',
+        'const HALF = LIMIT / 2',
+        'const b = scaled max(1.0, 2.0)',
+        '',
+    ]))
+    consts = _consts(ir)
+    assert consts['LIMIT']['value'] == 5 and consts['LIMIT']['elem_type'] == 'i32'
+    assert consts['HALF']['value'] == 2.5 and consts['HALF']['elem_type'] == 'f32'
+    assert consts['b']['value'] == 4.0 and consts['b']['source'] == 'scaled'
+
+
+@pytest.mark.parametrize('source, message', [
+    ('@const\ndef inv [n: f32] -> f32 =\n    1 / n\n\nconst a = inv 0\n', r'@const inv: division by zero'),
+    ('@const\ndef root [] -> f32 =\n    sqrt(-1)\n', r'@const root: math domain error'),
+    ('@const\ndef tbl [] -> f32 =\n    table [i in 0..100] = 1 / (i - 50)\n', r'@const tbl at i=50: division by zero'),
+    ('@const\ndef bytes [] -> u8 =\n    table [i in 0..4] = i * 100\n', r'@const bytes at index 3: value 300 does not fit in u8'),
+    ('@const\ndef neg [] -> u32 =\n    -1\n', r'@const neg: value -1 does not fit in u32'),
+    ('@const\ndef bad [] -> f32 =\n    __import__(1)\n', r'only builtin calls are allowed'),
+    ('const x = nope 1\n', r'const x: nope is not a @const function'),
+    ('const BIG = 1e39\n', r'const BIG: value 1e\+39 does not fit in f32'),
+    ('@const\ndef huge [] -> f32 =\n    table [i in 0..100] = 1e37 * i\n', r'@const huge at index 35: value 3\.5e\+38 does not fit in f32'),
+    ('@const\nconst LIMIT = 5\n\ndef run [] =\n    ()\n', r'consts\.rt:2: @const must be followed by a def'),
+    ('@const\nstruct M\n  id: i32\n', r'consts\.rt:2: @const must be followed by a def'),
+    ('struct M\n  id: i32\n\ninto M\n  @const\n  def tbl [] -> f32 =\n    1.0\n', r'consts\.rt:5: @const is only supported on top-level functions'),
+])
+def test_errors_name_the_failing_definition(tmp_path, source, message):
+    with pytest.raises(ValueError, match=message):
+        _build(tmp_path, source)
+
+
+def test_header_and_source_emission(tmp_path):
+    ir = _build(tmp_path, '\n'.join([
+        '@const',
+        'def sin_table [] -> f32 =',
+        '    table [i in 0..4] = sin(tau * i / 4)',
+        '',
+        '@const',
+        'def kp [] -> i32 =',
+        '    1.0 * 100.0',
+        '',
+        '@const',
+        'def ramp [n: i32] -> u8 =',
+        '    table [i in 0..n] = i * 20',
+        '',
+        'const drive = ramp 10',
+        '',
+    ]))
+    outdir = tmp_path / 'out'
+    _generate_common_build_files(ir['modules'], outdir=str(outdir), target='linux')
+    header = (outdir / 'include' / 'consts.h').read_text(encoding='utf-8')
+    source = (outdir / 'src' / 'consts.cpp').read_text(encoding='utf-8')
+    assert 'extern const float sin_table[4];' in header
+    assert 'extern const int32_t kp;' in header
+    assert 'extern const unsigned char drive[10];' in header
+    assert 'const float sin_table[4] = {\n  0.0f, 1.0f, 1.2246467991473532e-16f, -1.0f,\n};' in source
+    assert 'const int32_t kp = 100;' in source
+    assert 'const unsigned char drive[10] = {\n  0, 20, 40, 60, 80, 100, 120, 140,\n  160, 180,\n};' in source
+    assert 'ramp' not in header
+    cxx = shutil.which('g++') or shutil.which('clang++')
+    if cxx:
+        subprocess.run([cxx, '-std=c++17', '-c', '-I' + str(outdir / 'include'), str(outdir / 'src' / 'consts.cpp'), '-o', str(tmp_path / 'consts.o')], check=True)